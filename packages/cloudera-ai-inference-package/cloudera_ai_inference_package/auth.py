@@ -1,14 +1,31 @@
 import logging
-import json
+import orjson
 import os
+import threading
+
+# Cache of jwt_path -> (mtime, access token) so repeated requests skip the
+# open+parse of the JWT file unless it has been rewritten.
+_JWT_CACHE = {}
+_JWT_CACHE_LOCK = threading.Lock()
 
 def getAccessToken(jwt_path: str):
-    if not os.path.exists(jwt_path):
+    try:
+        mtime = os.stat(jwt_path).st_mtime
+    except OSError:
         logging.error(f"{jwt_path} not found.")
         return None
-    with open(jwt_path, 'r') as f:
-        jwt_json = json.load(f)
+
+    with _JWT_CACHE_LOCK:
+        cached = _JWT_CACHE.get(jwt_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(jwt_path, 'rb') as f:
+        jwt_json = orjson.loads(f.read())
         if "access_token" in jwt_json and jwt_json["access_token"]:
-            return jwt_json["access_token"]
+            access_token = jwt_json["access_token"]
+            with _JWT_CACHE_LOCK:
+                _JWT_CACHE[jwt_path] = (mtime, access_token)
+            return access_token
     logging.error(f"No access token found in {jwt_path}")
     return None
@@ -1,16 +1,70 @@
+import asyncio
+import hashlib
 import json
 import logging
 import os
 from typing import ClassVar
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from jupyter_ai_magics import BaseEmbeddingsProvider
 from langchain_core.embeddings import Embeddings
 
 from cloudera_ai_inference_package.auth import getAccessToken
+from cloudera_ai_inference_package.caching import LRUCache
 from cloudera_ai_inference_package.error_messages import CopilotErrorMessages
 from cloudera_ai_inference_package.model_discovery import getCopilotModels
 
+# Per-text embedding cache: repeated snippets (file previews, system prompts)
+# skip the round-trip entirely, and partially overlapping batches only fetch
+# the texts not seen before.
+_EMBEDDING_CACHE = LRUCache(maxsize=1024)
+
+# Shared session so sequential requests reuse pooled TLS connections instead
+# of paying a new TCP+TLS handshake per call.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=2, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]
+        ),
+    ),
+)
+
+# Header dict for the current access token, rebuilt only when the cached JWT
+# rotates.
+_HEADERS_CACHE = {}
+
+
+def _getRequestHeaders(jwt_path):
+    access_token = getAccessToken(jwt_path)
+    headers = _HEADERS_CACHE.get(access_token)
+    if headers is None:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+        _HEADERS_CACHE.clear()
+        _HEADERS_CACHE[access_token] = headers
+    return headers
+
+
+_async_client = None
+
+
+def _getAsyncClient():
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            timeout=httpx.Timeout(60, connect=3.05),
+        )
+    return _async_client
+
 
 class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddings):
     id = "cloudera"
@@ -36,15 +90,20 @@ class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddin
     ai_inference_models = ai_inference_models + embedding_ai_inference_models
     models = models + embedding_models
 
+    # Precomputed name -> endpoint mapping so per-request lookup is O(1).
+    endpoint_by_name: ClassVar[dict] = {
+        model["name"]: model["endpoint"] for model in ai_inference_models
+    }
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.model_endpoint = self._get_inference_endpoint()
 
     def _get_inference_endpoint(self):
-        for ai_inference_model in self.ai_inference_models:
-            if ai_inference_model["name"] == self.model_id:
-                return ai_inference_model["endpoint"]
-        return ""
+        return self.endpoint_by_name.get(self.model_id, "")
+
+    EMBEDDING_BATCH_SIZE: ClassVar[int] = 256
+    MAX_CONCURRENT_EMBEDDING_REQUESTS: ClassVar[int] = 16
 
     def embed_documents(self, texts):
         return self._call(texts, "passage")
@@ -52,7 +111,13 @@ class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddin
     def embed_query(self, text):
         return self._call([text], "query")[0]
 
-    def _call(self, texts, mode):
+    async def aembed_documents(self, texts):
+        return await self._acall(texts, "passage")
+
+    async def aembed_query(self, text):
+        return (await self._acall([text], "query"))[0]
+
+    def _build_payload(self, texts, mode):
         if not self.model_endpoint:
             raise ValueError(
                 CopilotErrorMessages.MODEL_NOT_CONFIGURED, {"model": self.model_id}
@@ -64,22 +129,86 @@ class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddin
 
         # https://developer.nvidia.com/docs/nemo-microservices/embedding/source/openai-api.html#api-spec
         if self.API_SYNTAX == "OPENAI":
-            payload = json.dumps({"input": texts, "model": self.model_id + "-" + mode})
-
+            return json.dumps({"input": texts, "model": self.model_id + "-" + mode})
         elif self.API_SYNTAX == "NIM":
-            payload = json.dumps(
+            return json.dumps(
                 {"input": texts, "input_type": mode, "model": self.model_id}
             )
-        else:
-            raise ValueError(
-                CopilotErrorMessages.INTERNAL_ERROR, {"API_SYNTAX": self.API_SYNTAX}
+        raise ValueError(
+            CopilotErrorMessages.INTERNAL_ERROR, {"API_SYNTAX": self.API_SYNTAX}
+        )
+
+    def _extract_response_embeddings(self, response_json, texts):
+        if not "data" in response_json:
+            raise KeyError(
+                CopilotErrorMessages.MODEL_RESPONSE_ERROR,
+                {"reason": "no data field in response"},
             )
 
-        access_token = getAccessToken(self.jwt_path)
-        headers = {"Content-Type": "application/json",
-                   "Authorization": f"Bearer {access_token}"}
+        embeddings = self._extract_embedding_from_api_response(response_json["data"])
+        if len(embeddings) != len(texts):
+            raise RuntimeError(
+                CopilotErrorMessages.MODEL_RESPONSE_ERROR,
+                {
+                    "reason": "mismatching number of embeddings",
+                    "expedted_num_embeddings": len(embeddings),
+                    "actual_num_embeddings": len(texts),
+                },
+            )
+        return embeddings
+
+    def _call(self, texts, mode):
+        keys, embeddings, uncached = self._lookup_cached_embeddings(texts, mode)
+        if not uncached:
+            return embeddings
+        fetched = self._request_embeddings([text for _, text in uncached], mode)
+        return self._merge_fetched_embeddings(keys, embeddings, uncached, fetched)
+
+    async def _acall(self, texts, mode):
+        keys, embeddings, uncached = self._lookup_cached_embeddings(texts, mode)
+        if not uncached:
+            return embeddings
+        fetched = await self._arequest_embeddings(
+            [text for _, text in uncached], mode
+        )
+        return self._merge_fetched_embeddings(keys, embeddings, uncached, fetched)
+
+    def _cache_key(self, text, mode):
+        return hashlib.blake2b(
+            ("%s\x00%s\x00%s" % (self.model_id, mode, text)).encode()
+        ).digest()
+
+    def _lookup_cached_embeddings(self, texts, mode):
+        """Resolve texts from the embedding cache, returning the cache keys,
+        the (partially filled) result list, and the (position, text) pairs
+        still to be fetched."""
+        keys = [self._cache_key(text, mode) for text in texts]
+        embeddings = [_EMBEDDING_CACHE.get(key) for key in keys]
+        uncached = [
+            (position, text)
+            for position, (text, embedding) in enumerate(zip(texts, embeddings))
+            if embedding is None
+        ]
+        return keys, embeddings, uncached
+
+    def _merge_fetched_embeddings(self, keys, embeddings, uncached, fetched):
+        for (position, _), embedding in zip(uncached, fetched):
+            _EMBEDDING_CACHE.put(keys[position], embedding)
+            embeddings[position] = embedding
+        return embeddings
+
+    @classmethod
+    def clear_cache(cls):
+        _EMBEDDING_CACHE.clear()
+
+    def _request_embeddings(self, texts, mode):
+        payload = self._build_payload(texts, mode)
+
+        headers = _getRequestHeaders(self.jwt_path)
         try:
-            response = requests.post(self.model_endpoint, headers=headers, data=payload)
+            response = _SESSION.post(
+                self.model_endpoint, headers=headers, data=payload, timeout=(3.05, 60)
+            )
         except Exception as e:
             raise RuntimeError(
                 CopilotErrorMessages.MODEL_RESPONSE_ERROR,
@@ -102,27 +231,75 @@ class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddin
                 CopilotErrorMessages.MODEL_RESPONSE_ERROR,
                 {"reason": "not a JSON response"},
             )
-        if not "data" in response_json:
-            raise KeyError(
+        return self._extract_response_embeddings(response_json, texts)
+
+    async def _arequest_embeddings(self, texts, mode):
+        batch_size = self.EMBEDDING_BATCH_SIZE
+        batches = [
+            texts[start : start + batch_size]
+            for start in range(0, len(texts), batch_size)
+        ]
+        if not batches:
+            return []
+
+        # Dispatch the largest batches first so the slowest request does not
+        # start last, then reassemble the results in input order.
+        order = sorted(
+            range(len(batches)),
+            key=lambda i: sum(len(text) for text in batches[i]),
+            reverse=True,
+        )
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_EMBEDDING_REQUESTS)
+
+        async def bounded_batch(batch):
+            async with semaphore:
+                return await self._acall_batch(batch, mode)
+
+        results = await asyncio.gather(*(bounded_batch(batches[i]) for i in order))
+
+        embeddings = [None] * len(batches)
+        for batch_index, batch_embeddings in zip(order, results):
+            embeddings[batch_index] = batch_embeddings
+        return [embedding for batch in embeddings for embedding in batch]
+
+    async def _acall_batch(self, texts, mode):
+        payload = self._build_payload(texts, mode)
+
+        headers = _getRequestHeaders(self.jwt_path)
+        try:
+            response = await _getAsyncClient().post(
+                self.model_endpoint, headers=headers, content=payload
+            )
+        except Exception as e:
+            raise RuntimeError(
                 CopilotErrorMessages.MODEL_RESPONSE_ERROR,
-                {"reason": "no data field in response"},
+                {"reason": "failed talking to the model endpoint"},
             )
-
-        embeddings = self._extract_embedding_from_api_response(response_json["data"])
-        if len(embeddings) != len(texts):
+        if response.is_error:
             raise RuntimeError(
                 CopilotErrorMessages.MODEL_RESPONSE_ERROR,
                 {
-                    "reason": "mismatching number of embeddings",
-                    "expedted_num_embeddings": len(embeddings),
-                    "actual_num_embeddings": len(texts),
+                    "reason": "not_ok_status",
+                    "response_http_status": response.status_code,
+                    "response": response.text,
+                    "endpoint": self.model_endpoint,
                 },
             )
-        return embeddings
+        try:
+            response_json = response.json()
+        except Exception as e:
+            raise RuntimeError(
+                CopilotErrorMessages.MODEL_RESPONSE_ERROR,
+                {"reason": "not a JSON response"},
+            )
+        return self._extract_response_embeddings(response_json, texts)
 
     def _extract_embedding_from_api_response(self, response_data):
-        embeddings = [[]] * len(response_data)
-        expected_indices = set(range(len(response_data)))
+        # [None] * n rather than [[]] * n: the latter aliases one shared list
+        # across every slot.
+        num_expected = len(response_data)
+        embeddings = [None] * num_expected
+        num_filled = 0
         for embedding_data in response_data:
             if embedding_data.get("object", "") != "embedding":
                 continue
@@ -137,23 +314,31 @@ class ClouderaAIInferenceEmbeddingModelProvider(BaseEmbeddingsProvider, Embeddin
                 )
             index = embedding_data["index"]
             embedding = embedding_data["embedding"]
-            if index not in expected_indices:
+            if (
+                not isinstance(index, int)
+                or not 0 <= index < num_expected
+                or embeddings[index] is not None
+            ):
                 raise RuntimeError(
                     CopilotErrorMessages.MODEL_RESPONSE_ERROR,
                     {
                         "reason": "embedding index not expected",
                         "index": index,
-                        "expected_max_index": len(response_data) - 1,
+                        "expected_max_index": num_expected - 1,
                     },
                 )
-            expected_indices.remove(index)
             embeddings[index] = embedding
-        if len(expected_indices) > 0:
+            num_filled += 1
+        if num_filled != num_expected:
             raise RuntimeError(
                 CopilotErrorMessages.MODEL_RESPONSE_ERROR,
                 {
                     "reason": "no embedding found for some indices",
-                    "indices": expected_indices,
+                    "indices": [
+                        index
+                        for index, embedding in enumerate(embeddings)
+                        if embedding is None
+                    ],
                 },
             )
         return embeddings
@@ -1,13 +1,13 @@
-import base64
-import json
+import hashlib
 import logging
+import httpx
+import orjson
 import os
 import requests
-import subprocess
+from requests.adapters import HTTPAdapter, Retry
 from typing import Any, AsyncIterator, ClassVar, Dict, Iterator, List, Mapping, Optional
 
 from jupyter_ai_magics import BaseProvider
-from jupyter_ai_magics.providers import MultiEnvAuthStrategy
 from langchain.callbacks.manager import CallbackManagerForLLMRun
 from langchain.chat_models.base import SimpleChatModel
 from langchain.llms.base import LLM
@@ -18,8 +18,45 @@ from langchain_core.outputs import ChatGenerationChunk
 from langchain_core.runnables.config import RunnableConfig
 
 from cloudera_ai_inference_package.auth import getAccessToken
+from cloudera_ai_inference_package.caching import LRUCache
 from cloudera_ai_inference_package.model_discovery import getCopilotModels
 
+# Exact-match cache for non-streaming calls so repeated identical prompts
+# (magic command re-runs, notebook regeneration) skip the round-trip.
+# Streaming responses are never cached.
+_RESPONSE_CACHE = LRUCache(maxsize=1024)
+
+# Configure logging once at import; re-running basicConfig per provider
+# instantiation only contends on the logging lock.
+if not logging.getLogger().handlers:
+    logging.basicConfig(filename="copilot.txt", level=logging.DEBUG, format="")
+
+logger = logging.getLogger(__name__)
+
+# Shared session so sequential requests reuse pooled TLS connections instead
+# of paying a new TCP+TLS handshake per call.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=2, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]
+        ),
+    ),
+)
+
+# HTTP/2 client for streaming so concurrent token streams multiplex over a
+# single connection instead of opening one socket each.
+_STREAM_CLIENT = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    # Fail fast on connect; no read timeout so a slow model cannot get cut
+    # off mid-token.
+    timeout=httpx.Timeout(connect=3.05, read=None, write=60, pool=60),
+)
+
 
 class ClouderaAIInferenceLanguageModelProvider(BaseProvider, SimpleChatModel, LLM):
     id = "cloudera"
@@ -33,32 +70,27 @@ class ClouderaAIInferenceLanguageModelProvider(BaseProvider, SimpleChatModel, LL
     ai_inference_models: ClassVar[str] = ""
     models: ClassVar[str] = ""
     ai_inference_models, models = getCopilotModels(copilot_config_dir, model_type="inference")
+    # Precomputed name -> endpoint mapping so per-request lookup is O(1).
+    endpoint_by_name: ClassVar[Dict[str, str]] = {
+        model["name"]: model["endpoint"] for model in ai_inference_models
+    }
     jwt_path: ClassVar[str] = '/tmp/jwt'
 
     MAX_TOKENS: ClassVar[int] = 2048
 
     def __init__(self, **kwargs):
-        print(kwargs)
         # Call parent constructors first to initialize Pydantic
         super().__init__(**kwargs)
 
         # Now set the model attribute after Pydantic initialization
         self.model = kwargs.get("model_id", "")
 
-        logging.basicConfig(filename="copilot.txt", level=logging.DEBUG, format="")
-
-
     @property
     def _llm_type(self) -> str:
         return "cloudera"
 
     def GetInferenceEndpoint(self, model):
-        logging.error(self.ai_inference_models)
-        for endpoint in self.ai_inference_models:
-            logging.error(endpoint)
-            if endpoint['name'] == model:
-                return endpoint['endpoint']
-        return ""
+        return self.endpoint_by_name.get(model, "")
 
     def BuildChatCompletionMessage(self, messages):
         request_messages = []
@@ -93,12 +125,12 @@ class ClouderaAIInferenceLanguageModelProvider(BaseProvider, SimpleChatModel, LL
     ) -> Iterator[ChatGenerationChunk]:
         inference_endpoint = self.GetInferenceEndpoint(self.model)
         if not inference_endpoint:
-            logging.error("Unable to find endpoint: " + self.model)
+            logger.error("Unable to find endpoint: %s", self.model)
             return "Error: unable to find endpoint: " + self.model
 
         access_token = getAccessToken(self.jwt_path)
         if not access_token:
-            logging.error("Unable to get user session JWT.")
+            logger.error("Unable to get user session JWT.")
             return "Unable to get user session JWT."
 
         if inference_endpoint.find("chat/completions") != -1:
@@ -106,61 +138,58 @@ class ClouderaAIInferenceLanguageModelProvider(BaseProvider, SimpleChatModel, LL
             request_messages = self.BuildChatCompletionMessage(messages)
 
             request = {"messages": request_messages, "model": self.model, "temperature": 1, "max_tokens": self.MAX_TOKENS, "stream": True}
-            logging.info(f"request: {request}")
+            logger.debug("request: %s", request)
             try:
-                r = requests.post(
+                with _STREAM_CLIENT.stream(
+                    "POST",
                     inference_endpoint,
-                    data=json.dumps(request),
+                    content=orjson.dumps(request),
                     headers={'Content-Type': 'application/json',
                     'Authorization': 'Bearer ' + access_token},
-                    verify=True,
-                    stream=True
-                )
+                ) as r:
+                    for line in r.iter_lines():
+                        if not line:
+                            continue
+                        if line.startswith("data: "):
+                            line = line[6:]
+                        if line == "[DONE]":
+                            break
+                        choices = orjson.loads(line).get("choices")
+                        if choices:
+                            content = choices[0].get("delta", {}).get("content")
+                            if content:
+                                yield ChatGenerationChunk(message=AIMessageChunk(content=content))
             except Exception as e:
-                logging.error(e)
+                logger.error(e)
                 return "Request to Cloudera AI Inference Service failed."
-
-            for line in r.iter_lines():
-                decoded_line = line.decode('utf-8').removeprefix("data: ")
-                if decoded_line == "":
-                    continue
-                if decoded_line == "[DONE]":
-                    break
-                line_json = json.loads(decoded_line)
-                if "choices" in line_json and "delta" in line_json["choices"][0] and "content" in line_json["choices"][0]["delta"] and line_json["choices"][0]["delta"]["content"]:
-                    yield ChatGenerationChunk(message=AIMessageChunk(content=line_json["choices"][0]["delta"]["content"]))
         elif inference_endpoint.find("completions") != -1:
             # OpenAI Completions API
             prompt = self.BuildCompletionPrompt(messages)
-            req_data = '{"prompt": "' + prompt.encode('unicode_escape').decode("utf-8")
-
-            my_req_data = req_data + '","model":"' + self.model + '","temperature":1,"max_tokens":' + str(self.MAX_TOKENS) + ',"stream":true}'
-            logging.info('req:')
-            logging.info(my_req_data)
+            request = {"prompt": prompt, "model": self.model, "temperature": 1, "max_tokens": self.MAX_TOKENS, "stream": True}
+            logger.debug("request: %s", request)
 
             try:
-                r = requests.post(
+                with _STREAM_CLIENT.stream(
+                    "POST",
                     inference_endpoint,
-                    data = my_req_data,
+                    content=orjson.dumps(request),
                     headers={'Content-Type': 'application/json',
                     'Authorization': 'Bearer ' + access_token},
-                    verify=True,
-                    stream=True
-                )
+                ) as r:
+                    for line in r.iter_lines():
+                        if not line:
+                            continue
+                        if line.startswith("data: "):
+                            line = line[6:]
+                        if line == "[DONE]":
+                            break
+                        choices = orjson.loads(line).get("choices")
+                        if choices and "text" in choices[0]:
+                            yield ChatGenerationChunk(message=AIMessageChunk(content=choices[0]["text"]))
             except Exception as e:
-                logging.error(e)
+                logger.error(e)
                 return "Request to Cloudera AI Inference Service failed."
 
-            for line in r.iter_lines():
-                decoded_line = line.decode('utf-8').removeprefix("data: ")
-                if decoded_line == "":
-                    continue
-                if decoded_line == "[DONE]":
-                    break
-                line_json = json.loads(decoded_line)
-                if "choices" in line_json and "text" in line_json["choices"][0]:
-                    yield ChatGenerationChunk(message=AIMessageChunk(content=line_json["choices"][0]["text"]))
-
     def _call(
         # Supports notebook generation and magic commands.
         self,
@@ -171,57 +200,71 @@ class ClouderaAIInferenceLanguageModelProvider(BaseProvider, SimpleChatModel, LL
     ) -> str:
         inference_endpoint = self.GetInferenceEndpoint(self.model)
         if not inference_endpoint:
-            logging.error("Unable to find endpoint: " + self.model)
+            logger.error("Unable to find endpoint: %s", self.model)
             return "Error: unable to find endpoint: " + self.model
 
         access_token = getAccessToken(self.jwt_path)
         if not access_token:
-            logging.error("Unable to get user session JWT.")
+            logger.error("Unable to get user session JWT.")
             return "Unable to get user session JWT."
 
+        request_messages = self.BuildChatCompletionMessage(messages)
+        cache_key = hashlib.blake2b(
+            orjson.dumps((self.model, request_messages))
+        ).digest()
+        cached_response = _RESPONSE_CACHE.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+
         if inference_endpoint.find("chat/completions") != -1:
             # OpenAI Chat completions API
-            request_messages = self.BuildChatCompletionMessage(messages)
             request = {"messages": request_messages, "model": self.model, "temperature": 1, "max_tokens": self.MAX_TOKENS, "stream": False}
-            logging.info(json.dumps(request))
+            logger.debug("request: %s", request)
             try:
-                r = requests.post(inference_endpoint,
-                                  data=json.dumps(request),
+                r = _SESSION.post(inference_endpoint,
+                                  data=orjson.dumps(request),
                                   headers={'Content-Type': 'application/json',
                                   'Authorization': 'Bearer ' + access_token},
-                                  verify=True,
-                                  stream=False)
+                                  timeout=(3.05, 60))
                 rjson = r.json()
-                logging.info(f"rjson: {rjson}")
+                logger.debug("rjson: %s", rjson)
                 if rjson and rjson['choices'] and len(rjson['choices']) > 0 and rjson['choices'][0]['message'] and rjson['choices'][0]['message']['content']:
-                    return rjson['choices'][0]['message']['content']
+                    response = rjson['choices'][0]['message']['content']
+                    _RESPONSE_CACHE.put(cache_key, response)
+                    return response
             except Exception as e:
-                logging.error(e)
+                logger.error(e)
                 return "Request to Cloudera AI Inference Service failed."
         elif inference_endpoint.find("completions") != -1:
             # OpenAI Completions API
             prompt = self.BuildCompletionPrompt(messages)
-            logging.info(f"prompt: {prompt}")
+            logger.debug("prompt: %s", prompt)
             request = {"prompt": prompt, "model": self.model, "temperature": 1, "max_tokens": self.MAX_TOKENS, "stream": False}
-            logging.info(json.dumps(request))
+            logger.debug("request: %s", request)
 
             try:
-                r = requests.post(
+                r = _SESSION.post(
                     inference_endpoint,
-                    data = json.dumps(request),
+                    data = orjson.dumps(request),
                     headers={'Content-Type': 'application/json',
                     'Authorization': 'Bearer ' + access_token},
-                    verify=True,
-                    stream=False
+                    timeout=(3.05, 60)
                 )
                 rjson = r.json()
-                logging.info(f"rjson: {rjson}")
-                if r.json() and rjson['choices'] and len(rjson['choices']) > 0 and rjson['choices'][0]['text']:
-                    return rjson['choices'][0]['text']
+                logger.debug("rjson: %s", rjson)
+                choices = rjson.get('choices') if rjson else None
+                if choices and choices[0].get('text'):
+                    response = choices[0]['text']
+                    _RESPONSE_CACHE.put(cache_key, response)
+                    return response
             except Exception as e:
-                logging.error(e)
+                logger.error(e)
                 return "Request to Cloudera AI Inference Service failed."
 
+    @classmethod
+    def clear_cache(cls):
+        _RESPONSE_CACHE.clear()
+
     @property
     def _identifying_params(self) -> Mapping[str, Any]:
         # Get the identifying parameters.
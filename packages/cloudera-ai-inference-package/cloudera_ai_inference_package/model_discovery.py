@@ -1,9 +1,19 @@
-import json
 import os
+from functools import lru_cache
+
+import orjson
 
 from cloudera_ai_inference_package.error_messages import CopilotErrorMessages
 
 
+@lru_cache(maxsize=8)
+def _load_config(config_path, mtime):
+    # mtime is part of the cache key, so rewriting the config file
+    # invalidates the cached parse automatically.
+    with open(config_path, "rb") as f:
+        return orjson.loads(f.read())
+
+
 def getCopilotModels(config_dir, model_type):
     if model_type not in ["inference", "embedding"]:
         raise ValueError(
@@ -13,28 +23,27 @@ def getCopilotModels(config_dir, model_type):
                 "type": model_type,
             },
         )
-    if not config_dir or not os.path.exists(config_dir):
+    if not config_dir:
+        return [], []
+    try:
+        copilot_config = _load_config(config_dir, os.path.getmtime(config_dir))
+    except OSError:
         return [], []
 
     ai_inference_models = []
-    with open(config_dir) as f:
-        copilot_config = json.load(f)
-        if (
-            copilot_config
-            and "aiInferenceModels" in copilot_config
-            and copilot_config["aiInferenceModels"]
-        ):
-            ai_inference_models = copilot_config["aiInferenceModels"]
-
-    embeddingModelFilter = lambda model: model["endpoint"].endswith("/embeddings")
-    inferenceModelFilter = lambda model: not embeddingModelFilter(model)
-    if model_type == "inference":
-        ai_inference_models = list(filter(inferenceModelFilter, ai_inference_models))
-    elif model_type == "embedding":
-        ai_inference_models = list(filter(embeddingModelFilter, ai_inference_models))
-
-    models = []
-    for ai_inference_model in ai_inference_models:
-        models.append(ai_inference_model["name"])
+    if (
+        copilot_config
+        and "aiInferenceModels" in copilot_config
+        and copilot_config["aiInferenceModels"]
+    ):
+        ai_inference_models = copilot_config["aiInferenceModels"]
+
+    want_embedding = model_type == "embedding"
+    ai_inference_models = [
+        model
+        for model in ai_inference_models
+        if model["endpoint"].endswith("/embeddings") == want_embedding
+    ]
+    models = [model["name"] for model in ai_inference_models]
 
     return ai_inference_models, models
@@ -9,27 +9,24 @@ class FakeCMLAPI(object):
     api_client = cmlapi.default_client()
     api_client.send_copilot_event(req)
     """
+    FIELDS = (
+        "application_id",
+        "engine_id",
+        "event_details",
+        "event_type",
+        "include_selection",
+        "model_name",
+        "model_provider_id",
+        "model_type",
+        "prompt_word_count",
+    )
+
     class client(object):
         def send_copilot_event(self, req):
             logger = Logger("copilot")
-            if "application_id" in req.keys():
-                logger.info(f"application_id: {req['application_id']}")
-            if "engine_id" in req.keys():
-                logger.info(f"engine_id: {UsageTracker.engine_id}")
-            if "event_details" in req.keys():
-                logger.info(f"event_details: {req['event_details']}")
-            if "event_type" in req.keys():
-                logger.info(f"event_type: {req['event_type']}")
-            if "include_selection" in req.keys():
-                logger.info(f"include_selection: {req['include_selection']}")
-            if "model_name" in req.keys():
-                logger.info(f"model_name: {req['model_name']}")
-            if "model_provider_id" in req.keys():
-                logger.info(f"model_provider_id: {req['model_provider_id']}")
-            if "model_type" in req.keys():
-                logger.info(f"model_type: {req['model_type']}")
-            if "prompt_word_count" in req.keys():
-                logger.info(f"prompt_word_count: {req['prompt_word_count']}")
+            for key in FakeCMLAPI.FIELDS:
+                if key in req:
+                    logger.info("%s: %s", key, req[key])
 
     def default_client():
         return FakeCMLAPI.client()
@@ -39,7 +36,7 @@ try:
 except ImportError as e:
     cmlapi = FakeCMLAPI
 
-class Singleton:
+class Singleton(type):
     # Singleton pattern
     _instances = {}
     def __call__(cls, *args, **kwargs):
@@ -47,12 +44,12 @@ class Singleton:
             cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
 
-class UsageTracker(object):
-    __metaclass__ = Singleton
-
+class UsageTracker(metaclass=Singleton):
     engine_id = os.getenv("CDSW_ENGINE_ID")
 
+    def __init__(self):
+        self.api_client = cmlapi.default_client()
+
     def _SendCopilotEvent(self,  req):
         req["engine_id"] = self.engine_id
-        api_client = cmlapi.default_client()
-        api_client.send_copilot_event(req)
\ No newline at end of file
+        self.api_client.send_copilot_event(req)
\ No newline at end of file
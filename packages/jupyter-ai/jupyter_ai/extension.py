@@ -2,6 +2,7 @@ import os
 import re
 import time
 import types
+from collections import deque
 
 from dask.distributed import Client as DaskClient
 from importlib_metadata import entry_points
@@ -28,6 +29,10 @@ from .handlers import (
 )
 from .history import BoundedChatHistory
 
+# Upper bound on the number of chat messages kept for rendering the UI.
+# Old messages are dropped from the front once the buffer is full.
+CHAT_HISTORY_MAXLEN = 10_000
+
 CLOUDERA_COPILOT_AVATAR_ROUTE = ClouderaCopilotPersona.avatar_route
 CLOUDERA_COPILOT_AVATAR_PATH = str(
     os.path.join(os.path.dirname(__file__), "static", "cloudera-copilot.svg")
@@ -267,18 +272,23 @@ class AiExtension(ExtensionApp):
         self.settings["chat_clients"] = {}
         self.settings["jai_root_chat_handlers"] = {}
 
-        # list of chat messages to broadcast to new clients
+        # ring buffer of chat messages to broadcast to new clients
         # this is only used to render the UI, and is not the conversational
         # memory object used by the LM chain.
-        self.settings["chat_history"] = []
+        self.settings["chat_history"] = deque(maxlen=CHAT_HISTORY_MAXLEN)
+
+        # index of in-progress agent stream messages by ID, so stream chunks
+        # can find their parent message without scanning the history
+        self.settings["jai_open_streams"] = {}
 
         # conversational memory object used by LM chain
         self.settings["llm_chat_memory"] = BoundedChatHistory(
             k=self.default_max_chat_history
         )
 
-        # list of pending messages
-        self.settings["pending_messages"] = []
+        # pending messages; a deque so closing a pending message does not
+        # reallocate a full list
+        self.settings["pending_messages"] = deque()
 
         # get reference to event loop
         # `asyncio.get_event_loop()` is deprecated in Python 3.11+, in favor of
@@ -445,6 +455,18 @@ class AiExtension(ExtensionApp):
             # bind chat handlers to settings
             self.settings["jai_chat_handlers"] = chat_handlers
 
+        # pre-sorted (slash_id, handler) pairs, so the slash-commands endpoint
+        # does not have to filter and re-sort the handlers on every GET
+        self.settings["jai_sorted_slash_handlers"] = sorted(
+            (
+                (handler.routing_type.slash_id, handler)
+                for command, handler in chat_handlers.items()
+                if command != "default"
+                and handler.routing_type.routing_method == "slash_command"
+            ),
+            key=lambda pair: pair[0],
+        )
+
         return chat_handlers
 
     def _init_context_provders(self):
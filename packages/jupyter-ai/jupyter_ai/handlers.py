@@ -1,12 +1,13 @@
 import getpass
-import json
+import logging
 import os
+import secrets
 import time
-import uuid
 from asyncio import AbstractEventLoop, Event
-from dataclasses import asdict
+from collections import deque
 from typing import TYPE_CHECKING, Optional, cast
 
+import orjson
 import tornado
 from jupyter_ai.chat_handlers import BaseChatHandler, SlashCommandRoutingType
 from jupyter_ai.config_manager import ConfigManager, KeyEmptyError, WriteConflictError
@@ -56,11 +57,11 @@ class ChatHistoryHandler(BaseAPIHandler):
     """Handler to return message history"""
 
     @property
-    def chat_history(self) -> list[ChatMessage]:
+    def chat_history(self) -> "deque[ChatMessage]":
         return self.settings["chat_history"]
 
     @property
-    def pending_messages(self) -> list[PendingMessage]:
+    def pending_messages(self) -> "deque[PendingMessage]":
         return self.settings["pending_messages"]
 
     @tornado.web.authenticated
@@ -116,13 +117,19 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
         return self.chat_clients[self.client_id]
 
     @property
-    def chat_history(self) -> list[ChatMessage]:
+    def chat_history(self) -> "deque[ChatMessage]":
         return self.settings["chat_history"]
 
     @chat_history.setter
     def chat_history(self, new_history):
         self.settings["chat_history"] = new_history
 
+    @property
+    def open_streams(self) -> dict[str, AgentStreamMessage]:
+        """Dictionary mapping stream message IDs to their in-progress
+        `AgentStreamMessage` objects in the chat history."""
+        return self.settings["jai_open_streams"]
+
     @property
     def message_interrupted(self) -> dict[str, Event]:
         return self.settings["jai_message_interrupted"]
@@ -136,7 +143,7 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
         return self.settings["jai_event_loop"]
 
     @property
-    def pending_messages(self) -> list[PendingMessage]:
+    def pending_messages(self) -> "deque[PendingMessage]":
         return self.settings["pending_messages"]
 
     @pending_messages.setter
@@ -183,25 +190,28 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
         collaborative = collaborative_legacy or collaborative_v3
 
         if collaborative:
-            names = self.current_user.name.split(" ", maxsplit=2)
-            initials = getattr(self.current_user, "initials", None)
+            user = self.current_user
+            initials = getattr(user, "initials", None)
             if not initials:
                 # compute default initials in case IdentityProvider doesn't
                 # return initials, e.g. JupyterHub (#302)
-                names = self.current_user.name.split(" ", maxsplit=2)
-                initials = "".join(
-                    [(name.capitalize()[0] if len(name) > 0 else "") for name in names]
-                )
-            chat_user_kwargs = {
-                **asdict(self.current_user),
-                "initials": initials,
-            }
-
-            return ChatUser(**chat_user_kwargs)
+                names = user.name.split(" ", maxsplit=2)
+                initials = "".join(name[:1].capitalize() for name in names)
+
+            # the identity provider's user object is already typed, so skip
+            # pydantic validation when wrapping it
+            return ChatUser.model_construct(
+                username=user.username,
+                initials=initials,
+                name=user.name,
+                display_name=user.display_name,
+                color=user.color,
+                avatar_url=user.avatar_url,
+            )
 
         login = getpass.getuser()
         initials = login[0].capitalize()
-        return ChatUser(
+        return ChatUser.model_construct(
             username=self.current_user.username,
             initials=initials,
             name=login,
@@ -212,7 +222,7 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
 
     def generate_client_id(self):
         """Generates a client ID to identify the current WS connection."""
-        return uuid.uuid4().hex
+        return secrets.token_hex(16)
 
     def open(self):
         """Handles opening of a WebSocket connection. Client ID can be retrieved
@@ -224,13 +234,15 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
         self.root_chat_handlers[client_id] = self
         self.chat_clients[client_id] = ChatClient(**current_user, id=client_id)
         self.client_id = client_id
+        # serialize through pydantic-core and send the JSON string directly,
+        # instead of handing tornado a dict to re-encode with the stdlib
         self.write_message(
             ConnectionMessage(
                 client_id=client_id,
                 history=ChatHistory(
                     messages=self.chat_history, pending_messages=self.pending_messages
                 ),
-            ).model_dump()
+            ).model_dump_json()
         )
 
         self.log.info(f"Client connected. ID: {client_id}")
@@ -251,46 +263,44 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
             return
 
         self.log.debug("Broadcasting message: %s to all clients...", message)
-        client_ids = self.root_chat_handlers.keys()
-
-        for client_id in client_ids:
-            client = self.root_chat_handlers[client_id]
+        # serialize and UTF-8 encode once; tornado sends bytes through as a
+        # websocket frame without re-encoding them per client
+        payload = message.model_dump_json().encode("utf-8")
+        for client in self.root_chat_handlers.values():
             if client:
-                client.write_message(message.model_dump())
+                client.write_message(payload)
 
         # append all messages of type `ChatMessage` directly to the chat history
         if isinstance(
             message, (HumanChatMessage, AgentChatMessage, AgentStreamMessage)
         ):
             self.chat_history.append(message)
+            if isinstance(message, AgentStreamMessage) and not message.complete:
+                self.open_streams[message.id] = message
         elif isinstance(message, AgentStreamChunkMessage):
             # for stream chunks, modify the corresponding `AgentStreamMessage`
             # by appending its content and potentially marking it as complete.
             chunk: AgentStreamChunkMessage = message
 
-            # iterate backwards from the end of the list
-            for history_message in self.chat_history[::-1]:
-                if (
-                    history_message.type == "agent-stream"
-                    and history_message.id == chunk.id
-                ):
-                    stream_message: AgentStreamMessage = history_message
-                    stream_message.body += chunk.content
-                    stream_message.metadata = chunk.metadata
-                    stream_message.complete = chunk.stream_complete
-                    break
+            stream_message = self.open_streams.get(chunk.id)
+            if stream_message is not None:
+                stream_message.body += chunk.content
+                stream_message.metadata = chunk.metadata
+                stream_message.complete = chunk.stream_complete
+                if chunk.stream_complete:
+                    del self.open_streams[chunk.id]
         elif isinstance(message, PendingMessage):
             self.pending_messages.append(message)
         elif isinstance(message, ClosePendingMessage):
-            self.pending_messages = list(
-                filter(lambda m: m.id != message.id, self.pending_messages)
+            self.pending_messages = deque(
+                m for m in self.pending_messages if m.id != message.id
             )
 
     async def on_message(self, message):
         self.log.debug("Message received: %s", message)
 
         try:
-            message = json.loads(message)
+            message = orjson.loads(message)
             if message.get("type") == "clear":
                 request = ClearRequest(**message)
             elif message.get("type") == "stop":
@@ -315,7 +325,7 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
             message_body += f"\n\n```\n{chat_request.selection.source}\n```\n"
 
         # message broadcast to chat clients
-        chat_message_id = str(uuid.uuid4())
+        chat_message_id = secrets.token_hex(16)
         chat_message = HumanChatMessage(
             id=chat_message_id,
             time=time.time(),
@@ -339,6 +349,7 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
         # if no target, clear all messages
         if not target:
             self.chat_history.clear()
+            self.open_streams.clear()
             self.pending_messages.clear()
             self.llm_chat_memory.clear()
             self.broadcast_message(ClearMessage())
@@ -346,7 +357,7 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
             return
 
         # otherwise, clear a single message
-        for msg in self.chat_history[::-1]:
+        for msg in reversed(self.chat_history):
             # interrupt the single message
             if msg.type == "agent-stream" and getattr(msg, "reply_to", None) == target:
                 try:
@@ -357,14 +368,21 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
                     pass
                 break
 
-        self.chat_history[:] = [
+        # rebuild in place: chat handlers and context providers hold a
+        # reference to this deque, so it must never be replaced
+        remaining = [
             msg
             for msg in self.chat_history
             if msg.id != target and getattr(msg, "reply_to", None) != target
         ]
-        self.pending_messages[:] = [
+        self.chat_history.clear()
+        self.chat_history.extend(remaining)
+        for stream_id, stream_message in list(self.open_streams.items()):
+            if stream_id == target or stream_message.reply_to == target:
+                del self.open_streams[stream_id]
+        self.pending_messages = deque(
             msg for msg in self.pending_messages if msg.reply_to != target
-        ]
+        )
         self.llm_chat_memory.clear([target])
         self.broadcast_message(ClearMessage(targets=[target]))
 
@@ -398,21 +416,17 @@ class RootChatHandler(JupyterHandler, websocket.WebSocketHandler):
 
     async def _route(self, message):
         """Method that routes an incoming message to the appropriate handler."""
-        default = self.chat_handlers["default"]
-        # Split on any whitespace, either spaces or newlines
-        maybe_command = message.body.split(None, 1)[0]
-        is_command = (
-            message.body.startswith("/")
-            and maybe_command in self.chat_handlers.keys()
-            and maybe_command != "default"
-        )
-        command = maybe_command if is_command else "default"
+        body = message.body
+        command = "default"
+        if body[:1] == "/":
+            # only split off the first word when the message can actually be
+            # a command
+            maybe_command = body.split(None, 1)[0]
+            if maybe_command != "default" and maybe_command in self.chat_handlers:
+                command = maybe_command
 
         start = time.time()
-        if is_command:
-            await self.chat_handlers[command].on_message(message)
-        else:
-            await default.on_message(message)
+        await self.chat_handlers[command].on_message(message)
 
         latency_ms = round((time.time() - start) * 1000)
         command_readable = "Default" if command == "default" else command
@@ -459,15 +473,27 @@ class ProviderHandler(BaseAPIHandler):
         if self.blocked_models is None and self.allowed_models is None:
             return providers
 
-        def filter_predicate(local_model_id: str):
-            model_id = provider.id + ":" + local_model_id
-            if self.blocked_models:
-                return model_id not in self.blocked_models
-            else:
-                return model_id in cast(list, self.allowed_models)
+        use_blocklist = bool(self.blocked_models)
+        listed_models = frozenset(
+            self.blocked_models if use_blocklist else cast(list, self.allowed_models)
+        )
 
         # filter out every model w/ model ID according to allow/blocklist
         for provider in providers:
+            # strip this provider's prefix from the listed global model IDs
+            # once, so the per-model test is a set lookup with no string
+            # concatenation
+            prefix = provider.id + ":"
+            local_listed = {
+                model_id[len(prefix):]
+                for model_id in listed_models
+                if model_id.startswith(prefix)
+            }
+            if use_blocklist:
+                filter_predicate = lambda m: m not in local_listed
+            else:
+                filter_predicate = lambda m: m in local_listed
+
             provider.models = list(filter(filter_predicate, provider.models or []))
             provider.chat_models = list(
                 filter(filter_predicate, provider.chat_models or [])
@@ -479,6 +505,34 @@ class ProviderHandler(BaseAPIHandler):
         # filter out every provider with no models which satisfy the allow/blocklist, then return
         return filter((lambda p: len(p.models) > 0), providers)
 
+    def _finish_providers_response(self, providers: list[ListProvidersEntry]):
+        """Applies the model allow/blocklist, sorts the surviving entries by
+        name, and writes the response. Shared by both provider endpoints."""
+        providers = sorted(self._filter_blocked_models(providers), key=lambda p: p.name)
+        self.finish(ListProvidersResponse(providers=providers).model_dump_json())
+
+
+# Parsed copilot config cache: path -> (st_mtime_ns, models). Storing one
+# entry per path means a rewritten config file replaces its stale entry
+# instead of accumulating superseded mtimes.
+_CONFIG_CACHE: dict[str, tuple[int, list]] = {}
+
+
+def _load_third_party_models(config_path):
+    """Returns the `thirdPartyModels` list of a copilot config file, caching
+    the parsed result until the file is modified. Each call gets fresh dict
+    copies: callers fill in `provider_id` in place, and the chat and
+    embeddings handlers apply different fill-in rules to the same file."""
+    if not config_path or not os.path.exists(config_path):
+        return []
+    mtime_ns = os.stat(config_path).st_mtime_ns
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is None or cached[0] != mtime_ns:
+        with open(config_path, "rb") as f:
+            models = orjson.loads(f.read()).get("thirdPartyModels") or []
+        cached = _CONFIG_CACHE[config_path] = (mtime_ns, models)
+    return [dict(model) for model in cached[1]]
+
 
 class ModelProviderHandler(ProviderHandler):
     def getConfiguredThirdPartyModels(self):
@@ -487,28 +541,18 @@ class ModelProviderHandler(ProviderHandler):
             self.log.warning("Copilot config dir does not exist")
             return []
 
-        f = open(copilot_config_dir)
-        copilot_config = json.load(f)
-        third_party_models = []
-        if copilot_config and "thirdPartyModels" in copilot_config and copilot_config["thirdPartyModels"]:
-            third_party_models = copilot_config["thirdPartyModels"]
-
-        copilot_embedding_config_dir = os.getenv("COPILOT_EMBEDDING_CONFIG_DIR")
-        if copilot_embedding_config_dir and os.path.exists(copilot_embedding_config_dir):
-            f = open(copilot_embedding_config_dir)
-            copilot_embedding_config = json.load(f)
-            if copilot_embedding_config and "thirdPartyModels" in copilot_embedding_config and copilot_embedding_config["thirdPartyModels"]:
-                third_party_models += copilot_embedding_config["thirdPartyModels"]
+        third_party_models = _load_third_party_models(copilot_config_dir)
+        third_party_models += _load_third_party_models(
+            os.getenv("COPILOT_EMBEDDING_CONFIG_DIR")
+        )
 
         # Fill in provider_id if it is missing.
         for third_party_model in third_party_models:
-            print(third_party_model)
             if len(third_party_model["provider_id"]) == 0:
                 if third_party_model["name"].startswith("anthropic"):
                     third_party_model["provider_id"] = "bedrock-chat"
                 else:
                     third_party_model["provider_id"] = "bedrock"
-        f.close()
         return third_party_models
 
     @web.authenticated
@@ -524,12 +568,16 @@ class ModelProviderHandler(ProviderHandler):
                 continue
 
             if "bedrock" in provider.id:
-                configured_models_names = [
-                    model['name'] for model in models if model['provider_id'] == provider.id] if models else []
-                enabled_models = [model for model in provider.models if model in configured_models_names]
+                configured_model_names = frozenset(
+                    model['name'] for model in models if model['provider_id'] == provider.id
+                )
+                enabled_models = [model for model in provider.models if model in configured_model_names]
             else:
                 enabled_models = provider.models
 
+            # set for the O(1) membership tests below
+            enabled_model_set = frozenset(enabled_models)
+
             optionals = {}
             if provider.model_id_label:
                 optionals["model_id_label"] = provider.model_id_label
@@ -539,8 +587,8 @@ class ModelProviderHandler(ProviderHandler):
                     id=provider.id,
                     name=provider.name,
                     models=enabled_models,
-                    chat_models=[model for model in provider.chat_models() if model in enabled_models],
-                    completion_models=[model for model in provider.completion_models() if model in enabled_models],
+                    chat_models=[model for model in provider.chat_models() if model in enabled_model_set],
+                    completion_models=[model for model in provider.completion_models() if model in enabled_model_set],
                     help=provider.help,
                     auth_strategy=provider.auth_strategy,
                     registry=provider.registry,
@@ -549,13 +597,8 @@ class ModelProviderHandler(ProviderHandler):
                 )
             )
 
-        # Step 2: sort & filter providers
-        providers = self._filter_blocked_models(providers)
-        providers = sorted(providers, key=lambda p: p.name)
-
-        # Finally, yield response.
-        response = ListProvidersResponse(providers=providers)
-        self.finish(response.model_dump_json())
+        # Step 2: sort & filter providers, then yield response.
+        self._finish_providers_response(providers)
 
 class EmbeddingsModelProviderHandler(ProviderHandler):
     def getConfiguredThirdPartyModels(self):
@@ -563,24 +606,19 @@ class EmbeddingsModelProviderHandler(ProviderHandler):
         if not copilot_config_dir or not os.path.exists(copilot_config_dir):
             self.log.warning("Copilot config dir does not exist")
             return []
-    
-        f = open(copilot_config_dir)
-        copilot_config = json.load(f)
-        third_party_models = []
-        if copilot_config and "thirdPartyModels" in copilot_config and copilot_config["thirdPartyModels"]:
-            third_party_models = copilot_config["thirdPartyModels"]
+
+        third_party_models = _load_third_party_models(copilot_config_dir)
 
         # Fill in provider_id if it is missing.
         for third_party_model in third_party_models:
             if len(third_party_model["provider_id"]) == 0:
                 third_party_model["provider_id"] = "bedrock"
-        f.close()
         return third_party_models
 
     @web.authenticated
     def get(self):
         models = self.getConfiguredThirdPartyModels()
-        configured_model_names = [model['name'] for model in models] if models else []
+        configured_model_names = frozenset(model['name'] for model in models)
 
         providers = []
 
@@ -589,7 +627,7 @@ class EmbeddingsModelProviderHandler(ProviderHandler):
                 continue
 
             if "bedrock" in provider.id:
-                enabled_models = [model for model in provider.models if (model) in configured_model_names]
+                enabled_models = [model for model in provider.models if model in configured_model_names]
             else:
                 enabled_models = provider.models
 
@@ -605,11 +643,7 @@ class EmbeddingsModelProviderHandler(ProviderHandler):
                 )
             )
 
-        providers = self._filter_blocked_models(providers)
-        providers = sorted(providers, key=lambda p: p.name)
-
-        response = ListProvidersResponse(providers=providers)
-        self.finish(response.model_dump_json())
+        self._finish_providers_response(providers)
 
 
 class GlobalConfigHandler(BaseAPIHandler):
@@ -629,6 +663,14 @@ class GlobalConfigHandler(BaseAPIHandler):
 
         self.finish(config.model_dump_json())
 
+    def _log_config_error(self, e: Exception):
+        """Logs an expected config-update failure, formatting the full
+        traceback only when debug logging is enabled."""
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.exception(e)
+        else:
+            self.log.warning("Config update failed: %s", e)
+
     @web.authenticated
     def post(self):
         try:
@@ -637,10 +679,10 @@ class GlobalConfigHandler(BaseAPIHandler):
             self.set_status(204)
             self.finish()
         except (ValidationError, WriteConflictError, KeyEmptyError) as e:
-            self.log.exception(e)
+            self._log_config_error(e)
             raise HTTPError(500, str(e)) from e
         except ValueError as e:
-            self.log.exception(e)
+            self._log_config_error(e)
             raise HTTPError(500, str(e.cause) if hasattr(e, "cause") else str(e))
         except Exception as e:
             self.log.exception(e)
@@ -670,44 +712,33 @@ class SlashCommandsInfoHandler(BaseAPIHandler):
         return self.settings["jai_config_manager"]
 
     @property
-    def chat_handlers(self) -> dict[str, "BaseChatHandler"]:
-        return self.settings["jai_chat_handlers"]
+    def sorted_slash_handlers(self) -> list[tuple[str, "BaseChatHandler"]]:
+        """(slash_id, handler) pairs pre-sorted by slash ID at startup."""
+        return self.settings["jai_sorted_slash_handlers"]
 
     @web.authenticated
     def get(self):
         response = ListSlashCommandsResponse()
 
         # if no selected LLM, return an empty response
-        if not self.config_manager.lm_provider:
+        lm_provider = self.config_manager.lm_provider
+        if not lm_provider:
             self.finish(response.model_dump_json())
             return
 
-        for id, chat_handler in self.chat_handlers.items():
-            # filter out any chat handler that is not a slash command
-            if (
-                id == "default"
-                or chat_handler.routing_type.routing_method != "slash_command"
-            ):
-                continue
-
-            # hint the type of this attribute
-            routing_type: SlashCommandRoutingType = chat_handler.routing_type
-
+        unsupported = set(lm_provider.unsupported_slash_commands or ())
+        for slash_id, chat_handler in self.sorted_slash_handlers:
             # filter out any chat handler that is unsupported by the current LLM
-            if (
-                "/" + routing_type.slash_id
-                in self.config_manager.lm_provider.unsupported_slash_commands
-            ):
+            if "/" + slash_id in unsupported:
                 continue
 
             response.slash_commands.append(
                 ListSlashCommandsEntry(
-                    slash_id=routing_type.slash_id, description=chat_handler.help
+                    slash_id=slash_id, description=chat_handler.help
                 )
             )
 
-        # sort slash commands by slash id and deliver the response
-        response.slash_commands.sort(key=lambda sc: sc.slash_id)
+        # already sorted by slash id; deliver the response
         self.finish(response.model_dump_json())
 
 
@@ -1,5 +1,6 @@
 import csv
 import dataclasses
+import functools
 import time
 from concurrent.futures import as_completed, ThreadPoolExecutor
 from datetime import datetime
@@ -23,6 +24,12 @@ AVAILABLE_BEDROCK_CHAT_MODELS = BedrockChatProvider.chat_models()
 # AVAILABLE_BEDROCK_MODELS = ['amazon.titan-text-lite-v1']
 # AVAILABLE_BEDROCK_CHAT_MODELS: list[str] = []
 
+# One worker per model, capped; the default ThreadPoolExecutor sizing is
+# based on CPU count, which has nothing to do with how many models we query.
+MAX_EVALUATION_WORKERS = min(
+    32, len(AVAILABLE_BEDROCK_MODELS) + len(AVAILABLE_BEDROCK_CHAT_MODELS)
+) or 1
+
 def get_streaming_file_path(timestamp: datetime) -> Path:
     """
     Generate the file path for saving streaming data based on the given timestamp.
@@ -35,27 +42,28 @@ def get_streaming_file_path(timestamp: datetime) -> Path:
     """
     return DATA_DIR / f'{STREAMING_DATA_FILE_NAME}-{timestamp.strftime("%Y-%m-%d_%H-%M-%S")}.csv'
 
-def save_streaming_data(streaming_data: StreamingData, timestamp: datetime):
+STREAMING_DATA_FIELD_NAMES = [field.name for field in dataclasses.fields(StreamingData)]
+
+def save_streaming_data(writer, streaming_data: StreamingData):
     """
-    Save streaming data to a CSV file. Create a new file if it doesn't exist.
+    Write one row of streaming data to an already-open CSV writer.
     
     Args:
+        writer: The csv.writer for the open CSV file.
         streaming_data (StreamingData): The streaming data to save.
-        timestamp (datetime): The timestamp to include in the file name.
     """
-    file_path = get_streaming_file_path(timestamp)
-
-    is_file_new = not file_path.exists()
-    with open(file_path, 'a', newline='') as csvfile:
-        fieldnames = [field.name for field in dataclasses.fields(StreamingData)]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        if is_file_new:
-            writer.writeheader()
-        writer.writerow(dataclasses.asdict(streaming_data))
+    # a plain value sequence goes straight to the C csv writer, with no
+    # per-row dict building or field-name mapping
+    writer.writerow([getattr(streaming_data, name) for name in STREAMING_DATA_FIELD_NAMES])
 
+@functools.lru_cache(maxsize=64)
 def create_llm_chain(model_id: str, provider: type[BaseProvider]) -> tuple[RunnableWithMessageHistory, bool]:
     """
     Create a language model chain using the specified model and provider.
+    The chain is cached per (model_id, provider), so evaluating several prompts
+    against the same model reuses one chain instead of rebuilding the provider
+    and prompt template each time. Conversation state is still isolated because
+    get_session_history constructs a fresh BoundedChatHistory per session.
     
     Args:
         model_id (str): The identifier of the model.
@@ -175,7 +183,13 @@ def evaluate_prompt(prompt_data: PromptData, timestamp: datetime):
     """
     print(f'Started evaluating prompt:\n{prompt_data.prompt}')
 
-    with ThreadPoolExecutor() as executor:
+    # open the CSV once per prompt instead of reopening it for every row
+    with open(get_streaming_file_path(timestamp), 'a', newline='') as csvfile, \
+            ThreadPoolExecutor(max_workers=MAX_EVALUATION_WORKERS) as executor:
+        writer = csv.writer(csvfile)
+        if csvfile.tell() == 0:
+            writer.writerow(STREAMING_DATA_FIELD_NAMES)
+
         # all the tasks in this list will be evaluated in parallel using a thread pool.
         # a vast majority of the time is spent waiting on the models to respond, so this should not hurt the quality of our timing data.
         futures = [
@@ -189,7 +203,7 @@ def evaluate_prompt(prompt_data: PromptData, timestamp: datetime):
         for i, future in enumerate(as_completed(futures)):
             data = future.result()
             update_rating(data, prompt_data.expected_response, i, len(futures))
-            save_streaming_data(data, timestamp)
+            save_streaming_data(writer, data)
 
 if __name__ == '__main__':
     """
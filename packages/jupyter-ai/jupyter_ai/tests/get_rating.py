@@ -1,11 +1,11 @@
 import curses
+import functools
 import os
 import textwrap
-from typing import Any, Generator
 
-from jupyter_ai.tests.utils import Gen, StreamingData # type: ignore
+from jupyter_ai.tests.utils import StreamingData # type: ignore
 
-KEYS_ENTER = {curses.KEY_ENTER, ord('\n'), ord('\r'), ord(' ')}
+KEYS_ENTER = frozenset({curses.KEY_ENTER, ord('\n'), ord('\r'), ord(' ')})
 
 def get_line_length() -> int:
     """
@@ -18,26 +18,68 @@ def get_line_length() -> int:
 
 DEFAULT_LINE_LENGTH = get_line_length()
 
-def get_title(title: str, line_length: int = DEFAULT_LINE_LENGTH) -> Generator[str, Any, None]:
+@functools.lru_cache(maxsize=32)
+def get_title(title: str, line_length: int = DEFAULT_LINE_LENGTH) -> tuple[str, str, str]:
     """
-    Generate a title formatted with a border for display in the terminal.
+    Format a title with a border for display in the terminal.
+
+    The result is cached, since the same titles are redrawn on every keypress.
 
     Args:
         title (str): The title text to display.
         line_length (int, optional): The length of the line for formatting. Defaults to DEFAULT_LINE_LENGTH.
 
-    Yields:
-        Generator[str, Any, None]: Formatted lines of the title.
+    Returns:
+        tuple[str, str, str]: Formatted lines of the title.
     """
     usable_length = line_length - 6
+    border = '  +' + '-' * usable_length + '+  '
 
-    yield '  +' + '-' * usable_length + '+  '
-    yield '  |{: ^{usable_length}}|  '.format(title, usable_length=usable_length)
-    yield '  +' + '-' * usable_length + '+  '
+    return (
+        border,
+        '  |{: ^{usable_length}}|  '.format(title, usable_length=usable_length),
+        border,
+    )
 
-def get_string(string: str, start_at: int = 0, num_lines: int = -1, line_length: int = DEFAULT_LINE_LENGTH, right_padding: int = 0) -> Generator[str, Any, int]:
+@functools.lru_cache(maxsize=8)
+def wrap_string(string: str, wrap_length: int) -> tuple[str, ...]:
     """
-    Generate formatted lines of a string for display in the terminal.
+    Wrap every line of a string to the given width, caching the result.
+
+    draw() re-renders the same strings on every keypress, so caching the
+    wrapped segments means scrolling only pays for a slice, not a re-wrap.
+
+    Args:
+        string (str): The string to wrap.
+        wrap_length (int): The maximum width of each wrapped segment.
+
+    Returns:
+        tuple[str, ...]: The wrapped segments; blank lines become empty segments.
+    """
+    segments: list[str] = []
+
+    # split('\n') iterates without the universal-newline scanning of
+    # splitlines(); these strings only ever contain plain newlines
+    for line in string.split('\n'):
+        if not line: # handles blank lines
+            segments.append('')
+            continue
+
+        # fast path for lines without whitespace (e.g. long tokens in
+        # tracebacks): with no word boundaries to respect, wrapping a
+        # monospace line is just slicing it into width-sized chunks
+        if ' ' not in line and '\t' not in line:
+            segments.extend(line[i:i + wrap_length] for i in range(0, len(line), wrap_length))
+            continue
+
+        # uses python's built in text wrapping to format the line
+        segments.extend(textwrap.wrap(line, wrap_length, replace_whitespace=False, drop_whitespace=False, tabsize=4, break_on_hyphens=False))
+
+    return tuple(segments)
+
+def get_string(string: str, start_at: int = 0, num_lines: int = -1, line_length: int = DEFAULT_LINE_LENGTH, right_padding: int = 0) -> tuple[list[str], int]:
+    """
+    Format the lines of a string for display in the terminal.
 
     Args:
         string (str): The string to format.
@@ -46,51 +88,45 @@ def get_string(string: str, start_at: int = 0, num_lines: int = -1, line_length:
         line_length (int, optional): The length of the line for formatting. Defaults to DEFAULT_LINE_LENGTH.
         right_padding (int, optional): The number of spaces to pad on the right side of the line. Defaults to 0.
 
-    Yields:
-        Generator[str, Any, int]: Formatted lines of the string.
+    Returns:
+        tuple[list[str], int]: The formatted lines, and the total number of
+        wrapped content lines (for computing the scroll range).
     """
     usable_length = line_length - 6
     padded_length = usable_length - 4
 
-    yield '  |' + ' ' * usable_length + '|  '
+    # build the repeated blank and border lines once instead of per line
+    blank_line = '  |' + ' ' * usable_length + '|  '
+    border_line = '  +' + '-' * usable_length + '+  '
 
-    line_on = 0
-    num_printed = 0
+    lines = [blank_line]
 
-    for line in string.splitlines():
-        if not line: # handles blank lines
-            line_on += 1
+    segments = wrap_string(string, padded_length - right_padding)
+    line_on = len(segments)
 
-            if num_lines != -1 and (line_on <= start_at or line_on > start_at + num_lines):
-                continue
+    # only the visible window of segments needs formatting
+    window = segments if num_lines == -1 else segments[start_at:start_at + num_lines]
+    num_printed = len(window)
 
-            yield '  |' + ' ' * usable_length + '|  '
-            num_printed += 1
-            continue
+    for line_segment in window:
+        if not line_segment: # handles blank lines
+            lines.append(blank_line)
+        else:
+            lines.append('  |  ' + line_segment + ' ' * (padded_length - len(line_segment)) + '  |  ')
 
-        # uses python's built in text wrapping to format the line
-        for line_segment in textwrap.wrap(line, padded_length - right_padding, replace_whitespace=False, drop_whitespace=False, tabsize=4):
-            line_on += 1
-
-            if num_lines != -1 and (line_on <= start_at or line_on > start_at + num_lines):
-                continue
-
-            yield '  |  ' + line_segment + ' ' * (padded_length - len(line_segment)) + '  |  '
-            num_printed += 1
-            
-    yield '  |' + ' ' * usable_length + '|  '
+    lines.append(blank_line)
 
     # if start_at is too large, provides extra padding so that the size of the text box does not change
     num_to_print = min(num_lines, line_on)
 
     if num_lines != -1:
         while num_printed < num_to_print:
-            yield '  |' + ' ' * usable_length + '|  '
+            lines.append(blank_line)
             num_printed += 1
 
-    yield '  +' + '-' * usable_length + '+  '
+    lines.append(border_line)
 
-    return line_on
+    return lines, line_on
 
 class GetRating:
     """
@@ -146,6 +182,17 @@ class GetRating:
         self.index = index
         self.total = total
         self.expected = expected
+        self._expected_cache: 'tuple[int, list[str]] | None' = None
+        """Rendered lines of the expected response, keyed by the terminal width they were rendered for."""
+        self._option_borders = ['+' + '-' * len(option) + '+' for option in self.options]
+        """Precomputed top/bottom border of each rating option box."""
+        self._option_positions: dict[int, list[int]] = {}
+        """x-positions of the rating option boxes, keyed by terminal width."""
+        self._stars = [
+            '★' * rating + '☆' * (len(self.options) - rating - 1)
+            for rating in range(len(self.options))
+        ]
+        """Star-progress strings indexed by rating, built once instead of per redraw."""
 
     def _draw_option(self, screen: 'curses._CursesWindow', index: int, x: int, y: int): # type: ignore
         """
@@ -158,16 +205,17 @@ class GetRating:
             y (int): The y-coordinate to start drawing.
         """
         option = self.options[index]
+        border = self._option_borders[index]
         text_attr = curses.A_STANDOUT if self.current_rating == index else curses.A_NORMAL
         border_attr = curses.A_STANDOUT if self.current_rating == index else curses.A_NORMAL
 
-        screen.addstr(y, x, '+' + '-' * len(option) + '+', border_attr)
+        screen.addstr(y, x, border, border_attr)
         y += 1
         screen.addstr(y, x, '|', border_attr)
         screen.addstr(y, x + 1, option, text_attr)
         screen.addstr(y, x + len(option) + 1, '|', border_attr)
         y += 1
-        screen.addstr(y, x, '+' + '-' * len(option) + '+', border_attr)
+        screen.addstr(y, x, border, border_attr)
 
     def draw_not_enough_lines(self, screen: 'curses._CursesWindow', num_missing: int=-1): # type: ignore
         """
@@ -177,7 +225,7 @@ class GetRating:
             screen (curses._CursesWindow): The curses screen object.
             num_missing (int, optional): The number of missing lines. Defaults to -1.
         """
-        screen.clear()
+        screen.erase()
 
         screen.addstr(0, 0, 'Not enough rows in terminal to draw UI')
         screen.addstr(1, 0, 'Please expand your terminal and/or decrease its font size')
@@ -191,58 +239,68 @@ class GetRating:
         Args:
             screen (curses._CursesWindow): The curses screen object.
         """
-        screen.clear()
+        # erase() blanks the in-memory buffer without scheduling a full
+        # physical repaint, so curses can diff against the previous frame
+        screen.erase()
 
         max_y, max_x = screen.getmaxyx()
+        # bind the hot method as a local, since draw calls it O(sections) per keypress
+        addstr = screen.addstr
 
         x, y = 0, 0
     
         try: # tries drawing the UI. If it fails to draw the UI due to not enough rows in terminal, it will call draw_not_enough_lines instead.
             # Starts by drawing the user input
-            for line in get_title('User Input', max_x):
-                screen.addstr(y, x, line)
-                y += 1
+            # each section is written with a single addstr so curses batches
+            # the terminal writes instead of issuing one per line
+            title_lines = get_title('User Input', max_x)
+            addstr(y, x, '\n'.join(title_lines))
+            y += len(title_lines)
 
             progress = f'{self.index}/{self.total}'
-            screen.addstr(y - 2, 5, progress, curses.A_BOLD)
+            addstr(y - 2, 5, progress, curses.A_BOLD)
 
-            stars = '★' * self.current_rating + '☆' * (len(self.options) - self.current_rating - 1)
-            screen.addstr(y - 2, max_x - len(self.options) - 4, stars, curses.A_BOLD)
+            stars = self._stars[self.current_rating]
+            addstr(y - 2, max_x - len(self.options) - 4, stars, curses.A_BOLD)
             
             max_num_lines = max(5, max_y // 5)
-            gen = Gen(get_string(self.data.get_prompt(), self.prompt_line_on, max_num_lines, max_x, right_padding=2))
+            lines, total_lines = get_string(self.data.get_prompt(), self.prompt_line_on, max_num_lines, max_x, right_padding=2)
             start_y = y
-            for line in gen:
-                screen.addstr(y, x, line)
-                y += 1
+            addstr(y, x, '\n'.join(lines))
+            y += len(lines)
             
             end_y = y - 2
-            self.max_prompt_line_on = gen.value - max_num_lines
+            self.max_prompt_line_on = total_lines - max_num_lines
             y += 1
 
             # Draws the scroll bar showing current scroll progress
-            if gen.value > max_num_lines:
-                screen.addstr(start_y, max_x - 5, 'W')
-                screen.addstr(end_y, max_x - 5, 'S')
+            if total_lines > max_num_lines:
+                addstr(start_y, max_x - 5, 'W')
+                addstr(end_y, max_x - 5, 'S')
 
-                progress = round(self.prompt_line_on / self.max_prompt_line_on * (end_y - start_y - 2))
-                screen.addstr(start_y + progress + 1, max_x  - 5, '▒')
+                # integer arithmetic with round-half-up; avoids the float division
+                progress = (self.prompt_line_on * (end_y - start_y - 2) + self.max_prompt_line_on // 2) // self.max_prompt_line_on
+                addstr(start_y + progress + 1, max_x  - 5, '▒')
 
             # Next draws the expected response
-            for line in get_title('Expected Response', max_x):
-                screen.addstr(y, x, line)
-                y += 1
-
-            for line in get_string(self.expected, 0, -1, max_x):
-                screen.addstr(y, x, line)
-                y += 1
+            title_lines = get_title('Expected Response', max_x)
+            addstr(y, x, '\n'.join(title_lines))
+            y += len(title_lines)
+
+            # the expected response never changes, so reuse its rendered
+            # lines until the terminal width does
+            if self._expected_cache is None or self._expected_cache[0] != max_x:
+                self._expected_cache = (max_x, get_string(self.expected, 0, -1, max_x)[0])
+            lines = self._expected_cache[1]
+            addstr(y, x, '\n'.join(lines))
+            y += len(lines)
             
             y += 1
 
             # Finally draws the response provided by the LLM
-            for line in get_title('AI Assistant Response', max_x):
-                screen.addstr(y, x, line)
-                y += 1
+            title_lines = get_title('AI Assistant Response', max_x)
+            addstr(y, x, '\n'.join(title_lines))
+            y += len(title_lines)
             
             max_num_lines = max_y - y - 7
 
@@ -250,29 +308,35 @@ class GetRating:
                 self.draw_not_enough_lines(screen, 1 - max_num_lines)
                 return
 
-            gen = Gen(get_string(self.data.get_generation(), self.resp_line_on, max_num_lines, max_x, right_padding=2))
+            lines, total_lines = get_string(self.data.get_generation(), self.resp_line_on, max_num_lines, max_x, right_padding=2)
             start_y = y
-            for line in gen:
-                screen.addstr(y, x, line)
-                y += 1
+            addstr(y, x, '\n'.join(lines))
+            y += len(lines)
 
             end_y = y - 2
-            self.max_resp_line_on = gen.value - max_num_lines
+            self.max_resp_line_on = total_lines - max_num_lines
             y += 1
 
             # Draws the scroll bar showing the current scroll progress
-            if gen.value > max_num_lines:
-                screen.addstr(start_y, max_x - 5, '↑')
-                screen.addstr(end_y, max_x - 5, '↓')
-
-                progress = round(self.resp_line_on / self.max_resp_line_on * (end_y - start_y - 2))
-                screen.addstr(start_y + progress + 1, max_x  - 5, '▒')
-
-            padded_length = max_x - 4
-            center_distance = padded_length / len(self.options)
-
-            for i, option in enumerate(self.options):
-                self._draw_option(screen, i, int(3 + i * center_distance + len(option) / 2), y)
+            if total_lines > max_num_lines:
+                addstr(start_y, max_x - 5, '↑')
+                addstr(end_y, max_x - 5, '↓')
+
+                progress = (self.resp_line_on * (end_y - start_y - 2) + self.max_resp_line_on // 2) // self.max_resp_line_on
+                addstr(start_y + progress + 1, max_x  - 5, '▒')
+
+            positions = self._option_positions.get(max_x)
+            if positions is None:
+                padded_length = max_x - 4
+                center_distance = padded_length / len(self.options)
+                positions = [
+                    int(3 + i * center_distance + len(option) / 2)
+                    for i, option in enumerate(self.options)
+                ]
+                self._option_positions[max_x] = positions
+
+            for i in range(len(self.options)):
+                self._draw_option(screen, i, positions[i], y)
 
             y += 3
         except Exception as e:
@@ -294,6 +358,38 @@ class GetRating:
             # Curses failed to initialize color support, eg. when TERM=vt100
             curses.initscr()
 
+    def _scroll_prompt_up(self):
+        self.prompt_line_on = max(0, self.prompt_line_on - 1)
+
+    def _scroll_prompt_down(self):
+        self.prompt_line_on = min(self.max_prompt_line_on, self.prompt_line_on + 1)
+
+    def _rating_left(self):
+        self.current_rating = max(0, self.current_rating - 1)
+
+    def _rating_right(self):
+        self.current_rating = min(len(self.options) - 1, self.current_rating + 1)
+
+    def _scroll_resp_up(self):
+        self.resp_line_on = max(0, self.resp_line_on - 1)
+
+    def _scroll_resp_down(self):
+        self.resp_line_on = min(self.max_resp_line_on, self.resp_line_on + 1)
+
+    KEY_HANDLERS = {
+        ord('w'): _scroll_prompt_up,
+        ord('W'): _scroll_prompt_up,
+        ord('s'): _scroll_prompt_down,
+        ord('S'): _scroll_prompt_down,
+        ord('a'): _rating_left,
+        curses.KEY_LEFT: _rating_left,
+        ord('d'): _rating_right,
+        curses.KEY_RIGHT: _rating_right,
+        curses.KEY_UP: _scroll_resp_up,
+        curses.KEY_DOWN: _scroll_resp_down,
+    }
+    """Maps each recognized key to its handler, replacing a chain of set membership tests with one dict lookup."""
+
     def run_loop(self, screen: 'curses._CursesWindow') -> int: # type: ignore
         """
         Run the main loop for handling user input and updating the UI.
@@ -304,33 +400,25 @@ class GetRating:
         Returns:
             int: The final rating chosen by the user.
         """
-        while True:
-            self.draw(screen)
+        self.draw(screen)
+        getch = screen.getch
 
-            key = screen.getch()
+        while True:
+            key = getch()
 
             if key in KEYS_ENTER:
                 return self.current_rating
-            
-            if key in {ord('w'), ord('W')}:
-                self.prompt_line_on = max(0, self.prompt_line_on  - 1)
-            
-            if key in {ord('s'), ord('S')}:
-                self.prompt_line_on = min(self.max_prompt_line_on, self.prompt_line_on + 1)
 
-            if key in {ord('a'), curses.KEY_LEFT}:
-                self.current_rating = max(0, self.current_rating - 1)
-            
-            if key in {ord('d'), curses.KEY_RIGHT}:
-                self.current_rating = min(len(self.options) - 1, self.current_rating + 1)
-
-            match key:
-                case curses.KEY_UP:
-                    self.resp_line_on = max(0, self.resp_line_on - 1)
-                case curses.KEY_DOWN:
-                    self.resp_line_on = min(self.max_resp_line_on, self.resp_line_on + 1)
-                case _:
-                    pass
+            # snapshot the scroll/rating state so unrecognized keys can skip
+            # the redraw entirely
+            state = (self.prompt_line_on, self.resp_line_on, self.current_rating)
+
+            handler = self.KEY_HANDLERS.get(key)
+            if handler is not None:
+                handler(self)
+
+            if key == curses.KEY_RESIZE or (self.prompt_line_on, self.resp_line_on, self.current_rating) != state:
+                self.draw(screen)
 
 
     def _start(self, screen: 'curses._CursesWindow') -> int: # type: ignore
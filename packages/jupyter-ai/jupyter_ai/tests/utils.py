@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Generator, NamedTuple
+from typing import Any, NamedTuple
 
 from jupyter_ai_magics.providers import BaseProvider, BedrockChatProvider, BedrockProvider
 
@@ -92,38 +92,35 @@ class StreamingData:
         self.generation = self.generation.encode('unicode_escape').decode()
         self.error_message = self.error_message.encode('unicode_escape').decode()
 
+        # Cache the decoded forms, since the rating UI re-reads them on every
+        # redraw. Plain attributes rather than dataclass fields, so they do
+        # not become CSV columns.
+        self._decoded_prompt = self.prompt.encode().decode('unicode_escape')
+        self._decoded_generation = self.generation.encode().decode('unicode_escape')
+
     def get_prompt(self) -> str:
         """
         Get the prompt, decoding any unicode escapes.
-        
+
         Returns:
             str: The decoded prompt.
         """
-        return self.prompt.encode().decode('unicode_escape')
-    
+        decoded = getattr(self, '_decoded_prompt', None)
+        if decoded is None:
+            decoded = self._decoded_prompt = self.prompt.encode().decode('unicode_escape')
+        return decoded
+
     def get_generation(self) -> str:
         """
         Get the generation, decoding any unicode escapes.
-        
+
         Returns:
             str: The decoded generation.
         """
-        return self.generation.encode().decode('unicode_escape')
-
-class Gen:
-    """
-    Wrapper class for a generator that stores the return value after iteration.
-    
-    Attributes:
-        gen (Generator[str, None, int]): The generator to wrap.
-        value (int): The final value yielded by the generator.
-    """
-    def __init__(self, gen: Generator[str, None, int]):
-        self.gen = gen
-
-    def __iter__(self) -> Generator[str, None, int]:
-        self.value = yield from self.gen
-        return self.value
+        decoded = getattr(self, '_decoded_generation', None)
+        if decoded is None:
+            decoded = self._decoded_generation = self.generation.encode().decode('unicode_escape')
+        return decoded
 
 PROMPTS_TO_EVALUATE: list[PromptData] = [
     PromptData('Who are you?', PromptType.IDENTITY, 'It should tell you that it is the Cloudera Copilot. It should not say another name or start talking with itself. It may tell you about itself but only if it stays on topic. Unacceptable: talks with itself, Low Quality: Incorrect information, Helpful: Announces something correct (assistant, Claude), Human: Says it is Cloudera Copilot'),